@@ -1,12 +1,5 @@
-try:
-    from manygit.gitlab import GitLabOAuthTokenAuth, GitLabPersonalAccessTokenAuth
-except ImportError:
-    pass
-
-try:
-    from manygit.github import GitHubOAuthTokenAuth, GitHubPersonalAccessTokenAuth
-except ImportError:
-    pass
+import importlib
+import typing as T
 
 from .connections import ConnectionManager
 from .types import (
@@ -20,3 +13,32 @@ from .types import (
     Repository,
     Tag,
 )
+
+if T.TYPE_CHECKING:
+    from .github import GitHubOAuthTokenAuth, GitHubPersonalAccessTokenAuth
+    from .gitlab import GitLabOAuthTokenAuth, GitLabPersonalAccessTokenAuth
+
+# Backend auth classes are imported on first access, so that `import manygit`
+# doesn't pull in github3 or python-gitlab unless they're actually used.
+_backend_exports = {
+    "GitHubOAuthTokenAuth": "manygit.github",
+    "GitHubPersonalAccessTokenAuth": "manygit.github",
+    "GitLabOAuthTokenAuth": "manygit.gitlab",
+    "GitLabPersonalAccessTokenAuth": "manygit.gitlab",
+}
+
+
+def __getattr__(name: str) -> T.Any:
+    if name in _backend_exports:
+        try:
+            module = importlib.import_module(_backend_exports[name])
+        except ImportError as e:
+            raise AttributeError(
+                f"{name} requires the optional dependencies of {_backend_exports[name]}"
+            ) from e
+
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,64 +1,139 @@
+import importlib
+import re
 import typing as T
 from collections import defaultdict
 
 from .exceptions import ConnectionException
 from .types import Connection, Repository
+from .utils import LRUCache, concurrent_map
 
 connection_classes: dict[type, type[Connection]] = {}
-available_hosts: T.DefaultDict[str, list[type]] = defaultdict(list)
+connection_hosts: dict[type, str] = {}
+available_hosts: dict[str, T.Tuple[type, ...]] = {}
+
+# The host name of a repo URL in any of the forms accepted by
+# `utils.parse_common_repo_formats`. For a bare `owner/name` this captures
+# the owner, which matches no connection's domain.
+_domain_pattern = re.compile(
+    r"(?:https://)?(?:ssh://)?(?:git@)?(?P<domain>[^/:@]+)[/:]"
+)
 
 
 def connection(*, host: str, auth_classes: list[type[T.Any]]):
     def _connection(klass: type[Connection]):
         for c in auth_classes:
             connection_classes[c] = klass
+            connection_hosts[c] = host
 
-        available_hosts[host].extend(auth_classes)
+        # Tuples, rebuilt on registration: backends register when they're
+        # first imported, after which the registry is only read.
+        available_hosts[host] = available_hosts.get(host, ()) + tuple(auth_classes)
 
         return klass
 
     return _connection
 
 
+# Backends register their connection classes when imported. `import manygit`
+# imports them lazily, so they're loaded here before the registry is listed.
+_backend_modules = ("manygit.gitlab", "manygit.github")
+
+
 def get_available_hosts() -> T.Iterable[str]:
+    for module in _backend_modules:
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            pass  # The backend's optional dependencies aren't installed.
+
     return available_hosts.keys()
 
 
 class ConnectionManager:
-    __slots__ = ["connections"]
+    __slots__ = ["connections", "_by_host", "_by_domain", "_repo_cache"]
 
     connections: list[T.Any]
+    _by_host: T.DefaultDict[str, list[T.Any]]
+    _by_domain: T.DefaultDict[str, list[T.Any]]
+    _repo_cache: LRUCache[T.Tuple[Connection, str], Repository]
 
     def __init__(self, connections: T.Optional[list[T.Any]] = None):
         self.connections = []
+        self._by_host = defaultdict(list)
+        self._by_domain = defaultdict(list)
+        self._repo_cache = LRUCache(maxsize=128)
         for c in connections or []:
             self.add_connection(c)
 
     def add_connection(self, conn: T.Any):
-        if type(conn) in connection_classes:
-            connection_class = connection_classes[type(conn)]
-            self.connections.append(connection_class(conn))
-        else:
+        auth_class = type(conn)
+        connection_class = connection_classes.get(auth_class)
+        if connection_class is None:
             raise ConnectionException(
                 f"{conn} is not an instance of a Git host authentication class"
             )
 
-    def get_repo(self, repo: str, host_hint: T.Optional[str] = None) -> Repository:
-        """Given a string and an optional hint as to the host service,
-        attempt to create a Repository instance."""
-
+        instance = connection_class(conn)
+        self.connections.append(instance)
+        self._by_host[connection_hosts[auth_class]].append(instance)
+        if instance.domain:
+            self._by_domain[instance.domain].append(instance)
+
+    def _resolve(
+        self, repo: str, host_hint: T.Optional[str]
+    ) -> T.Tuple[Connection, str]:
+        """Find the connection that accepts `repo`, and the repo's
+        normalized path on it. No request is made."""
         eligible_classes = self.connections
 
         if host_hint and host_hint in available_hosts:
-            eligible_classes = [
-                t for t in self.connections if type(t) in available_hosts[host_hint]
-            ]
+            eligible_classes = self._by_host[host_hint]
+        else:
+            # A URL naming a connection's domain goes straight to it.
+            m = _domain_pattern.match(repo)
+            if m and m["domain"] in self._by_domain:
+                eligible_classes = self._by_domain[m["domain"]]
 
         for conn in eligible_classes:
             repo_eligible, repo_normalized = conn.is_eligible_repo(repo)
             if repo_eligible:
-                return conn.get_repo(repo_normalized)
+                return conn, repo_normalized
 
         raise ConnectionException(
             f"No available connections accept the repo specification {repo}"
         )
+
+    def get_repo(self, repo: str, host_hint: T.Optional[str] = None) -> Repository:
+        """Given a string and an optional hint as to the host service,
+        attempt to create a Repository instance.
+
+        Repositories are cached by connection and normalized path, so
+        `https://github.com/o/n`, `git@github.com:o/n` and `o/n` share one
+        entry. Entries do not expire: a cached Repository holds the
+        project as it was first fetched. Call invalidate_repo() after
+        changing a project to have the next lookup fetch it again."""
+        key = self._resolve(repo, host_hint)
+        repository = self._repo_cache.get(key)
+        if repository is None:
+            conn, repo_normalized = key
+            repository = conn.get_repo(repo_normalized)
+            self._repo_cache[key] = repository
+        return repository
+
+    def get_repos(
+        self, repos: T.Iterable[str], host_hint: T.Optional[str] = None
+    ) -> list[Repository]:
+        """Resolve many repos at once, as get_repo() does. Distinct
+        strings are fetched concurrently; repositories are returned in
+        input order."""
+        repos = list(repos)
+        unique = list(dict.fromkeys(repos))
+        resolved = dict(
+            zip(unique, concurrent_map(lambda r: self.get_repo(r, host_hint), unique))
+        )
+        return [resolved[r] for r in repos]
+
+    def invalidate_repo(self, repo: str, host_hint: T.Optional[str] = None):
+        """Forget the Repository cached for `repo`, however it is spelled,
+        so the next get_repo() fetches it again."""
+        self._repo_cache.pop(self._resolve(repo, host_hint))
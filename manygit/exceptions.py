@@ -1,6 +1,8 @@
 import typing as T
 from functools import wraps
 
+F = T.TypeVar("F", bound=T.Callable[..., T.Any])
+
 
 class ManygitException(Exception):
     pass
@@ -26,27 +28,83 @@ class UnsupportedException(ManygitException):
     pass
 
 
-def map_exceptions(
-    exceptions: dict[T.Union[type[Exception], T.Callable[..., bool]], type[Exception]]
-):
-    def _wrapper(f):
+class map_exceptions:
+    """Translate exceptions raised by a backend library into manygit
+    exceptions. Use an instance as a decorator on methods, or as a
+    context manager, e.g. inside generators, whose bodies only run
+    after a decorator has already returned.
+
+    Keys are exception types, `(type, predicate)` pairs that map an
+    instance of the type only if the predicate accepts it, or bare
+    predicates, which are tried against any exception."""
+
+    __slots__ = ["type_map", "guarded", "predicates", "catch"]
+
+    type_map: dict[type, type[Exception]]
+    guarded: dict[type, list[T.Tuple[T.Callable[..., bool], type[Exception]]]]
+    predicates: list[T.Tuple[T.Callable[..., bool], type[Exception]]]
+    catch: T.Tuple[type[BaseException], ...]
+
+    def __init__(
+        self,
+        exceptions: dict[
+            T.Union[
+                type[Exception],
+                T.Tuple[type[Exception], T.Callable[..., bool]],
+                T.Callable[..., bool],
+            ],
+            type[Exception],
+        ],
+    ):
+        # Split the mapping once, up front: exception types, guarded or
+        # not, are resolved by walking the raised exception's MRO against
+        # a dict, and bare predicates are only consulted if no type matched.
+        self.type_map = {}
+        self.guarded = {}
+        self.predicates = []
+        for source, target in exceptions.items():
+            if isinstance(source, type):
+                self.type_map[source] = target
+            elif isinstance(source, tuple):
+                source_class, predicate = source
+                self.guarded.setdefault(source_class, []).append((predicate, target))
+            else:
+                self.predicates.append((source, target))
+
+        # With no bare predicates, only the mapped types need handling at
+        # all; anything else propagates without entering the handler.
+        self.catch = (
+            (Exception,)
+            if self.predicates
+            else tuple(self.type_map) + tuple(self.guarded)
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        if exc_value is None or not isinstance(exc_value, self.catch):
+            return False
+
+        for base in type(exc_value).__mro__:
+            for predicate, target_class in self.guarded.get(base, ()):
+                if predicate(exc_value):
+                    raise target_class(str(exc_value)) from exc_value
+
+            target_class = self.type_map.get(base)
+            if target_class is not None:
+                raise target_class(str(exc_value)) from exc_value
+
+        for predicate, target_class in self.predicates:
+            if predicate(exc_value):
+                raise target_class(str(exc_value)) from exc_value
+
+        return False
+
+    def __call__(self, f: F) -> F:
         @wraps(f)
         def _map_exceptions(*args, **kwargs):
-            try:
+            with self:
                 return f(*args, **kwargs)
-            except Exception as e:
-                for source_type in exceptions:
-                    if isinstance(source_type, type):
-                        if isinstance(e, source_type):
-                            target_class = exceptions[source_type]
-                            raise target_class(str(e))
-                    else:
-                        target_class = exceptions[source_type]
-                        if source_type(e):
-                            raise target_class(str(e))
-
-                raise
-
-        return _map_exceptions
-
-    return _wrapper
+
+        return T.cast(F, _map_exceptions)
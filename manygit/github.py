@@ -1,6 +1,7 @@
 import typing as T
+from contextlib import closing
 from dataclasses import dataclass
-from urllib.parse import urlsplit
+from urllib.parse import parse_qs, urlsplit
 
 import github3
 from github3.exceptions import GitHubException, TransportError
@@ -14,8 +15,14 @@ from github3.repos.release import Release as Github3Release
 from github3.repos.repo import Repository as Github3Repository
 from github3.repos.status import Status as Github3Status
 from github3.repos.tag import RepoTag as Github3RepoTag
+from requests import Response
 
-from manygit.utils import parse_common_repo_formats
+from manygit.utils import (
+    PER_PAGE,
+    CommitCache,
+    concurrent_map,
+    parse_common_repo_formats,
+)
 
 from .connections import connection
 from .exceptions import (
@@ -25,6 +32,7 @@ from .exceptions import (
     VCSException,
     map_exceptions,
 )
+from .session import shared_session
 from .types import (
     Branch,
     Commit,
@@ -39,14 +47,16 @@ from .types import (
 
 GITHUB_HOST = "GITHUB"
 
+A = T.TypeVar("A")
+
 
-@dataclass
+@dataclass(frozen=True)
 class GitHubOAuthTokenAuth:
     oauth_token: str
     enterprise_url: T.Optional[str] = None
 
 
-@dataclass
+@dataclass(frozen=True)
 class GitHubPersonalAccessTokenAuth:
     username: str
     personal_access_token: str
@@ -64,6 +74,19 @@ exc = map_exceptions(
 )
 
 
+def _get_page(
+    repo: Github3Repository,
+    url: str,
+    params: dict[str, str],
+    headers: T.Optional[dict[str, str]] = None,
+) -> T.Tuple[Response, list[T.Any]]:
+    """Fetch one page of a list endpoint. github3 has no public call for
+    this, so this is the one place that uses its private request helpers;
+    the github extra is capped below the next github3.py major version."""
+    response = repo._get(url, params=params, headers=headers)
+    return response, T.cast("list[T.Any]", repo._json(response, 200) or [])
+
+
 class GitHubCommitStatus(CommitStatus):
     __slots__ = ["commit_status"]
 
@@ -89,31 +112,36 @@ class GitHubCommitStatus(CommitStatus):
         return self.commit_status.target_url
 
 
-def commit_status_from_github_status(status: str) -> CommitStatusEnum:
-    if status == "pending":
-        return CommitStatusEnum.PENDING
-    elif status in ["failure", "error"]:
-        return CommitStatusEnum.FAILED
-    elif status == "success":
-        return CommitStatusEnum.SUCCESS
+_STATUS_FROM_GITHUB = {
+    "pending": CommitStatusEnum.PENDING,
+    "failure": CommitStatusEnum.FAILED,
+    "error": CommitStatusEnum.FAILED,
+    "success": CommitStatusEnum.SUCCESS,
+}
 
-    raise ManygitException(f"Invalid commit status value {str}")
+_STATUS_TO_GITHUB = {
+    CommitStatusEnum.PENDING: "pending",
+    CommitStatusEnum.FAILED: "failure",
+    CommitStatusEnum.SUCCESS: "success",
+}
+
+
+def commit_status_from_github_status(status: str) -> CommitStatusEnum:
+    try:
+        return _STATUS_FROM_GITHUB[status]
+    except KeyError:
+        raise ManygitException(f"Invalid commit status value {status}")
 
 
 def commit_status_to_github_status(status: CommitStatusEnum) -> str:
-    if status == CommitStatusEnum.PENDING:
-        return "pending"
-    elif status == CommitStatusEnum.FAILED:
-        return "failure"
-    elif status == CommitStatusEnum.SUCCESS:
-        return "success"
+    return _STATUS_TO_GITHUB[status]
 
 
 GitHub3Commit = T.Union[Github3ShortCommit, Github3RepoCommit]
 
 
 class GitHubCommit(Commit):
-    __slots__ = ["commit"]
+    __slots__ = ["commit", "repo"]
 
     commit: GitHub3Commit
     repo: "GitHubRepository"
@@ -127,19 +155,20 @@ class GitHubCommit(Commit):
         return self.commit.sha
 
     @property
-    @exc
     def statuses(self) -> T.Iterator[CommitStatus]:
-        for s in self.commit.statuses():
-            yield GitHubCommitStatus(T.cast(Github3Status, s))
+        with exc:
+            for s in self.commit.statuses():
+                yield GitHubCommitStatus(s)
 
     def download(self):
         raise NotImplementedError
 
     @property
-    @exc
     def parents(self) -> T.Iterator[Commit]:
-        for c in self.commit.parents:
-            yield self.repo.get_commit(c["sha"])
+        # Merge commits have several parents; fetch them together.
+        yield from concurrent_map(
+            self.repo.get_commit, [c["sha"] for c in self.commit.parents]
+        )
 
     @exc
     def set_commit_status(
@@ -176,20 +205,17 @@ class GitHubBranch(Branch):
         return self.branch.name
 
     @property
-    @exc
     def head(self) -> Commit:
-        # `self.branch.commit` is a MiniCommit, which we refresh
-        # into a RepoCommit.
-        return GitHubCommit(
-            T.cast(Github3RepoCommit, self.branch.commit.refresh()), self.repo
-        )
+        # `self.branch.commit` is a MiniCommit; fetch the full RepoCommit
+        # through the repo so that it is cached.
+        return self.repo.get_commit(self.branch.commit.sha)
 
 
 Github3AnyTag = T.Union[Github3RepoTag, Github3Tag]
 
 
 class GitHubTag(Tag):
-    __slots__ = ["tag"]
+    __slots__ = ["tag", "repo"]
 
     tag: Github3AnyTag
     repo: "GitHubRepository"
@@ -200,30 +226,44 @@ class GitHubTag(Tag):
 
     @property
     def name(self) -> str:
+        if isinstance(self.tag, Github3RepoTag):
+            return self.tag.name
         return self.tag.tag
 
     @property
     def commit(self) -> GitHubCommit:
+        if isinstance(self.tag, Github3RepoTag):
+            return self.repo.get_commit(self.tag.commit.sha)
         return self.repo.get_commit(self.tag.object.sha)
 
     @property
     def annotation(self) -> str:
+        # Tags from the list endpoint don't carry the annotation;
+        # fetch the tag object only when it's asked for.
+        if isinstance(self.tag, Github3RepoTag):
+            return self.repo.get_tag(self.name).annotation
         return self.tag.message
 
 
 class GitHubRelease(Release):
-    __slots__ = ["release"]
+    __slots__ = ["release", "repo", "_tag"]
 
     release: Github3Release
     repo: "GitHubRepository"
+    _tag: T.Optional[GitHubTag]
 
     def __init__(self, release: Github3Release, repo: "GitHubRepository"):
         self.release = release
         self.repo = repo
+        self._tag = None
 
     @property
     def tag(self) -> GitHubTag:
-        return self.repo.get_tag(self.release.tag_name)
+        # Resolving the tag costs two requests (ref, then tag object),
+        # and both `tag` and `commit` need it; resolve it once.
+        if self._tag is None:
+            self._tag = self.repo.get_tag(self.release.tag_name)
+        return self._tag
 
     @property
     def name(self) -> str:
@@ -235,7 +275,11 @@ class GitHubRelease(Release):
 
     @property
     def commit(self) -> Commit:
-        return self.tag.commit
+        if self._tag is not None:
+            return self._tag.commit
+        # The commits endpoint peels the tag name straight to its commit,
+        # which is one request rather than resolving the ref and tag first.
+        return self.repo.get_commit(self.release.tag_name)
 
     @property
     def is_draft(self) -> bool:
@@ -247,6 +291,7 @@ class GitHubRelease(Release):
 
 
 class GitHubPullRequest(PullRequest):
+    __slots__ = ["pull_request", "repo"]
 
     pull_request: Github3ShortPullRequest
     repo: "GitHubRepository"
@@ -269,12 +314,59 @@ class GitHubPullRequest(PullRequest):
 
 
 class GitHubRepository(Repository):
-    __slots__ = ["repo"]
+    __slots__ = ["repo", "_commit_cache"]
 
     repo: Github3Repository
+    _commit_cache: CommitCache[GitHubCommit]
 
     def __init__(self, repo: Github3Repository):
         self.repo = repo
+        self._commit_cache = CommitCache()
+
+    def _iter_pages(
+        self,
+        path: str,
+        model: T.Callable[..., A],
+        headers: T.Optional[dict[str, str]] = None,
+        **params: str,
+    ) -> T.Generator[A, None, None]:
+        """Iterate over every item of a paginated list endpoint. The
+        `Link: rel="last"` header of the first page gives the page count,
+        so the remaining pages are fetched concurrently, a few ahead of
+        the caller. GitHub omits `last` when it can't compute it; `next`
+        links are then followed one by one. Nothing past the first page is
+        requested until the caller has consumed it."""
+        url = f"{self.repo.url}/{path}"
+        params["per_page"] = str(PER_PAGE)
+
+        def get(
+            url: str, page_params: dict[str, str]
+        ) -> T.Tuple[Response, list[T.Any]]:
+            return _get_page(self.repo, url, page_params, headers)
+
+        response, items = get(url, params)
+        for item in items:
+            yield model(item, self.repo)
+
+        last = response.links.get("last")
+        if last:
+            last_page = int(parse_qs(urlsplit(last["url"]).query)["page"][0])
+            pages = concurrent_map(
+                lambda p: get(url, {**params, "page": str(p)}),
+                range(2, last_page + 1),
+            )
+            # Closing cancels the pages fetched ahead if the caller stops early.
+            with closing(pages):
+                for _, items in pages:
+                    for item in items:
+                        yield model(item, self.repo)
+            return
+
+        while "next" in response.links:
+            # The `next` URL carries every query parameter already.
+            response, items = get(response.links["next"]["url"], {})
+            for item in items:
+                yield model(item, self.repo)
 
     @property
     def commits(self) -> T.Iterator[GitHubCommit]:
@@ -282,6 +374,9 @@ class GitHubRepository(Repository):
 
     @exc
     def get_commit(self, sha: str) -> GitHubCommit:
+        return self._commit_cache.get_or_fetch(sha, self._fetch_commit)
+
+    def _fetch_commit(self, sha: str) -> GitHubCommit:
         # GitHub inexplicably returns 422 rather than 404 when a commit is not found.
         try:
             commit = self.repo.commit(sha)
@@ -289,13 +384,20 @@ class GitHubRepository(Repository):
             raise NotFoundError
         if not commit:
             raise NotFoundError
+
         return GitHubCommit(commit, self)
 
     @property
-    @exc
     def branches(self) -> T.Iterator[GitHubBranch]:
-        for branch in self.repo.branches():
-            yield self.get_branch(T.cast(Github3ShortBranch, branch).name)
+        # The list payload carries the branch name and head SHA, which is
+        # all GitHubBranch needs; `head` refreshes the commit on demand.
+        with exc:
+            for branch in self._iter_pages(
+                "branches",
+                Github3ShortBranch,
+                headers=Github3FullBranch.PREVIEW_HEADERS,
+            ):
+                yield GitHubBranch(branch, self)
 
     @exc
     def get_branch(self, name: str) -> GitHubBranch:
@@ -306,15 +408,14 @@ class GitHubRepository(Repository):
         return GitHubBranch(branch, self)
 
     @property
-    @exc
     def default_branch(self) -> GitHubBranch:
         return self.get_branch(self.repo.default_branch)
 
     @property
-    @exc
     def tags(self) -> T.Iterator[GitHubTag]:
-        for t in self.repo.tags():
-            yield GitHubTag(T.cast(Github3RepoTag, t), self)
+        with exc:
+            for t in self._iter_pages("tags", Github3RepoTag):
+                yield GitHubTag(t, self)
 
     @exc
     def get_tag(self, name: str) -> GitHubTag:
@@ -328,10 +429,10 @@ class GitHubRepository(Repository):
         return GitHubTag(tag, self)
 
     @property
-    @exc
     def releases(self) -> T.Iterator[GitHubRelease]:
-        for r in self.repo.releases():
-            yield GitHubRelease(T.cast(Github3Release, r), self)
+        with exc:
+            for r in self._iter_pages("releases", Github3Release):
+                yield GitHubRelease(r, self)
 
     @exc
     def get_release(self, tag_name: str) -> GitHubRelease:
@@ -341,10 +442,16 @@ class GitHubRepository(Repository):
         return GitHubRelease(release, self)
 
     @property
-    @exc
     def pull_requests(self) -> T.Iterator[GitHubPullRequest]:
-        for pr in self.repo.pull_requests(state="open"):
-            yield GitHubPullRequest(T.cast(Github3ShortPullRequest, pr), self)
+        with exc:
+            for pr in self._iter_pages(
+                "pulls",
+                Github3ShortPullRequest,
+                state="open",
+                sort="created",
+                direction="desc",
+            ):
+                yield GitHubPullRequest(pr, self)
 
     @exc
     def merge_branches(self, base: GitHubBranch, source: GitHubBranch) -> bool:
@@ -422,38 +529,44 @@ class GitHubRepository(Repository):
     host=GITHUB_HOST, auth_classes=[GitHubOAuthTokenAuth, GitHubPersonalAccessTokenAuth]
 )
 class GitHubConnection(Connection):
-    __slots__ = []
+    __slots__ = ["conn", "enterprise_url", "domain"]
 
     conn: T.Union[github3.github.GitHubEnterprise, github3.github.GitHub]
-    enterprise_url: T.Optional[str] = None
+    enterprise_url: T.Optional[str]
+    domain: str
 
     @exc
     def __init__(
         self, auth: T.Union[GitHubOAuthTokenAuth, GitHubPersonalAccessTokenAuth]
     ):
-        if isinstance(auth, GitHubPersonalAccessTokenAuth):
-            args = {"username": auth.username, "password": auth.personal_access_token}
-        else:
-            args = {"token": auth.oauth_token}
-
         if auth.enterprise_url:
-            self.conn = github3.github.GitHubEnterprise(auth.enterprise_url, **args)
+            self.conn = github3.github.GitHubEnterprise(auth.enterprise_url)
             self.enterprise_url = urlsplit(auth.enterprise_url).netloc
         else:
-            self.conn = github3.github.GitHub(**args)
+            self.conn = github3.github.GitHub()
             self.enterprise_url = None
 
+        # This is what the github3 constructors do with credentials, too.
+        if isinstance(auth, GitHubPersonalAccessTokenAuth):
+            self.conn.login(auth.username, auth.personal_access_token)
+        else:
+            self.conn.login(token=auth.oauth_token)
+
+        self.domain = self.enterprise_url or "github.com"
+
+        self.conn.session = shared_session(auth, self.conn.session)
+
     @exc
     def get_repo(self, repo: str) -> GitHubRepository:
-        repository = self.conn.repository(*repo.split("/"))
+        owner, _, name = repo.partition("/")
+        if not owner or not name or "/" in name:
+            # GitHub has no nested namespaces, so no such repo can exist.
+            raise NotFoundError(f"{repo} is not an owner/name repo path")
+
+        repository = self.conn.repository(owner, name)
         if not repository:
             raise NotFoundError
         return GitHubRepository(repository)
 
     def is_eligible_repo(self, repo: str) -> T.Tuple[bool, T.Optional[str]]:
-        if self.enterprise_url:
-            domain = self.enterprise_url
-        else:
-            domain = "github.com"
-
-        return parse_common_repo_formats(repo, domain)
+        return parse_common_repo_formats(repo, self.domain)
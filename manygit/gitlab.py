@@ -1,20 +1,21 @@
 import typing as T
+from contextlib import closing
 from dataclasses import dataclass
+from functools import partial
+from itertools import chain
 from urllib.parse import urlsplit
 
+from gitlab.base import RESTManager, RESTObject
 from gitlab.client import Gitlab
 from gitlab.exceptions import GitlabGetError
-from gitlab.v4.objects import (
-    Project,
-    ProjectBranch,
-    ProjectCommit,
-    ProjectCommitStatus,
-    ProjectMergeRequest,
-    ProjectRelease,
-    ProjectTag,
-)
+from requests import Response
 
-from manygit.utils import parse_common_repo_formats
+from manygit.utils import (
+    PER_PAGE,
+    CommitCache,
+    concurrent_map,
+    parse_common_repo_formats,
+)
 
 from .connections import connection
 from .exceptions import (
@@ -23,6 +24,7 @@ from .exceptions import (
     UnsupportedException,
     map_exceptions,
 )
+from .session import shared_session
 from .types import (
     Branch,
     Commit,
@@ -35,52 +37,125 @@ from .types import (
     Tag,
 )
 
+if T.TYPE_CHECKING:
+    # python-gitlab imports the v4 object classes itself when a client is
+    # created; importing them here would slow down `import manygit.gitlab`.
+    from gitlab.v4.objects import (
+        Project,
+        ProjectBranch,
+        ProjectCommit,
+        ProjectCommitStatus,
+        ProjectMergeRequest,
+        ProjectRelease,
+        ProjectTag,
+    )
+
+
 GITLAB_HOST = "GITLAB"
 
 
-@dataclass
+@dataclass(frozen=True)
 class GitLabOAuthTokenAuth:
     oauth_token: str
     enterprise_url: T.Optional[str] = None
 
 
-@dataclass
+@dataclass(frozen=True)
 class GitLabPersonalAccessTokenAuth:
     personal_access_token: str
     enterprise_url: T.Optional[str] = None
 
 
-def commit_status_from_gitlab(status: str) -> CommitStatusEnum:
-    if status in ["pending", "running"]:
-        return CommitStatusEnum.PENDING
-    elif status in ["failed", "canceled"]:
-        return CommitStatusEnum.FAILED
-    elif status == "success":
-        return CommitStatusEnum.SUCCESS
+_STATUS_FROM_GITLAB = {
+    "pending": CommitStatusEnum.PENDING,
+    "running": CommitStatusEnum.PENDING,
+    "failed": CommitStatusEnum.FAILED,
+    "canceled": CommitStatusEnum.FAILED,
+    "success": CommitStatusEnum.SUCCESS,
+}
 
-    raise ManygitException(f"Invalid commit status value {str}")
+_STATUS_TO_GITLAB = {
+    CommitStatusEnum.PENDING: "pending",
+    CommitStatusEnum.FAILED: "failed",
+    CommitStatusEnum.SUCCESS: "success",
+}
+
+
+def commit_status_from_gitlab(status: str) -> CommitStatusEnum:
+    try:
+        return _STATUS_FROM_GITLAB[status]
+    except KeyError:
+        raise ManygitException(f"Invalid commit status value {status}")
 
 
 def commit_status_to_gitlab(status: CommitStatusEnum) -> str:
-    if status is CommitStatusEnum.PENDING:
-        return "pending"
-    elif status is CommitStatusEnum.FAILED:
-        return "failed"
-    elif status is CommitStatusEnum.SUCCESS:
-        return "success"
+    return _STATUS_TO_GITLAB[status]
 
 
 exc = map_exceptions(
-    {lambda e: isinstance(e, GitlabGetError) and e.response_code == 404: NotFoundError}
+    {(GitlabGetError, lambda e: e.response_code == 404): NotFoundError}
 )
 
 
+def _build_object(
+    manager: RESTManager, attrs: dict[str, T.Any], **kwargs: T.Any
+) -> RESTObject:
+    """Build `manager`'s object class from an API payload. python-gitlab
+    has no public call for this, so this is the one place that uses its
+    private `_obj_cls`; the gitlab extra is capped below the next
+    python-gitlab major version."""
+    obj_cls = manager._obj_cls
+    assert obj_cls is not None
+    return obj_cls(manager, attrs, **kwargs)
+
+
+def _iter_pages(
+    manager: RESTManager, **params: T.Any
+) -> T.Generator[T.Any, None, None]:
+    """Iterate over every object of a paginated list endpoint. The
+    `X-Total-Pages` header of the first page gives the page count, so the
+    remaining pages are fetched concurrently, a few ahead of the caller.
+    GitLab omits the header for very large collections; `next` links are
+    then followed one by one. Nothing past the first page is requested
+    until the caller has consumed it."""
+    assert manager.path is not None
+    path = manager.path
+    params["per_page"] = PER_PAGE
+
+    def get(path: str, query_data: dict[str, T.Any]) -> T.Tuple[Response, T.Any]:
+        response = T.cast(
+            Response,
+            manager.gitlab.http_get(path, query_data=query_data, raw=True),
+        )
+        return response, response.json()
+
+    build = partial(_build_object, manager, created_from_list=True)
+
+    response, items = get(path, params)
+    yield from map(build, items)
+
+    total_pages = response.headers.get("X-Total-Pages")
+    if total_pages:
+        pages = concurrent_map(
+            lambda p: get(path, {**params, "page": p})[1],
+            range(2, int(total_pages) + 1),
+        )
+        # Closing cancels the pages fetched ahead if the caller stops early.
+        with closing(pages):
+            yield from map(build, chain.from_iterable(pages))
+        return
+
+    while "next" in response.links:
+        response, items = get(response.links["next"]["url"], {})
+        yield from map(build, items)
+
+
 class GitLabCommitStatus(CommitStatus):
     __slots__ = ["commit_status"]
 
-    commit_status: ProjectCommitStatus
+    commit_status: "ProjectCommitStatus"
 
-    def __init__(self, commit_status: ProjectCommitStatus):
+    def __init__(self, commit_status: "ProjectCommitStatus"):
         self.commit_status = commit_status
 
     @property
@@ -101,30 +176,31 @@ class GitLabCommitStatus(CommitStatus):
 
 
 class GitLabCommit(Commit):
-    __slots__ = ["commit"]
+    __slots__ = ["commit", "repo"]
 
-    commit: ProjectCommit
+    commit: "ProjectCommit"
+    repo: "GitLabRepository"
 
-    def __init__(self, commit: ProjectCommit):
+    def __init__(self, commit: "ProjectCommit", repo: "GitLabRepository"):
         self.commit = commit
+        self.repo = repo
 
     @property
     def sha(self) -> str:
         return self.commit.id
 
     @property
-    @exc
     def statuses(self) -> T.Iterator[CommitStatus]:
-        for cs in self.commit.statuses.list(all=True, as_list=False):
-            yield GitLabCommitStatus(T.cast(ProjectCommitStatus, cs))
+        with exc:
+            yield from map(GitLabCommitStatus, _iter_pages(self.commit.statuses))
 
     def download(self):
         raise NotImplementedError
 
     @property
     def parents(self) -> T.Iterator["GitLabCommit"]:
-        for c in self.commit.parent_ids:
-            yield GitLabCommit(self.commit.manager.get(c))  # type: ignore
+        # Merge commits have several parents; fetch them together.
+        yield from concurrent_map(self.repo.get_commit, self.commit.parent_ids)
 
     @exc
     def set_commit_status(
@@ -147,10 +223,10 @@ class GitLabCommit(Commit):
 
 class GitLabBranch(Branch):
     __slots__ = ["branch", "repo"]
-    branch: ProjectBranch
+    branch: "ProjectBranch"
     repo: "GitLabRepository"
 
-    def __init__(self, branch: ProjectBranch, repo: "GitLabRepository"):
+    def __init__(self, branch: "ProjectBranch", repo: "GitLabRepository"):
         self.branch = branch
         self.repo = repo
 
@@ -159,18 +235,17 @@ class GitLabBranch(Branch):
         return self.branch.name
 
     @property
-    @exc
     def head(self) -> GitLabCommit:
-        return self.repo.get_commit(self.branch.commit["id"])
+        return self.repo._commit_from_attrs(self.branch.commit)
 
 
 class GitLabTag(Tag):
     __slots__ = ["tag", "repo"]
 
-    tag: ProjectTag
+    tag: "ProjectTag"
     repo: "GitLabRepository"
 
-    def __init__(self, tag: ProjectTag, repo: "GitLabRepository"):
+    def __init__(self, tag: "ProjectTag", repo: "GitLabRepository"):
         self.tag = tag
         self.repo = repo
 
@@ -180,7 +255,9 @@ class GitLabTag(Tag):
 
     @property
     def commit(self) -> GitLabCommit:
-        return self.repo.get_commit(self.tag.target)
+        # `target` is the tag object's SHA for annotated tags; the
+        # embedded commit is always the one the tag points to.
+        return self.repo._commit_from_attrs(self.tag.commit)
 
     @property
     def annotation(self) -> str:
@@ -191,9 +268,9 @@ class GitLabRelease(Release):
     __slots__ = ["repo", "release"]
 
     repo: "GitLabRepository"
-    release: ProjectRelease
+    release: "ProjectRelease"
 
-    def __init__(self, release: ProjectRelease, repo: "GitLabRepository"):
+    def __init__(self, release: "ProjectRelease", repo: "GitLabRepository"):
         self.repo = repo
         self.release = release
 
@@ -211,14 +288,16 @@ class GitLabRelease(Release):
 
     @property
     def commit(self) -> GitLabCommit:
-        return self.repo.get_commit(self.release.commit["id"])
+        return self.repo._commit_from_attrs(self.release.commit)
 
 
 class GitLabPullRequest(PullRequest):
-    pr: ProjectMergeRequest
+    __slots__ = ["pr", "repo"]
+
+    pr: "ProjectMergeRequest"
     repo: "GitLabRepository"
 
-    def __init__(self, pr: ProjectMergeRequest, repo: "GitLabRepository"):
+    def __init__(self, pr: "ProjectMergeRequest", repo: "GitLabRepository"):
         self.pr = pr
         self.repo = repo
 
@@ -236,28 +315,47 @@ class GitLabPullRequest(PullRequest):
 
 
 class GitLabRepository(Repository):
-    __slots__ = ["repo"]
+    __slots__ = ["repo", "_commit_cache"]
 
-    repo: Project
+    repo: "Project"
+    _commit_cache: CommitCache[GitLabCommit]
 
-    def __init__(self, repo: Project):
+    def __init__(self, repo: "Project"):
         self.repo = repo
+        self._commit_cache = CommitCache()
 
     @property
-    @exc
     def commits(self) -> T.Iterator[GitLabCommit]:
-        for c in self.repo.commits.list(all=True, as_list=False):
-            yield GitLabCommit(T.cast(ProjectCommit, c))
+        with exc:
+            yield from map(
+                partial(GitLabCommit, repo=self), _iter_pages(self.repo.commits)
+            )
 
     @exc
     def get_commit(self, sha: str) -> GitLabCommit:
-        return GitLabCommit(self.repo.commits.get(id=sha))
+        return self._commit_cache.get_or_fetch(
+            sha, lambda sha: GitLabCommit(self.repo.commits.get(id=sha), self)
+        )
+
+    def _commit_from_attrs(self, attrs: dict[str, T.Any]) -> GitLabCommit:
+        """Wrap the commit embedded in a branch, tag or release payload.
+        It carries the ID and parent IDs `GitLabCommit` reads, so the
+        commit need not be fetched again. The payload is only part of the
+        commit, so it is not added to the commit cache; `get_commit()`
+        still returns fully fetched commits."""
+        cached = self._commit_cache.get(attrs["id"])
+        if cached is not None:
+            return cached
+
+        commit = _build_object(self.repo.commits, attrs)
+        return GitLabCommit(T.cast("ProjectCommit", commit), self)
 
     @property
-    @exc
     def branches(self) -> T.Iterator[GitLabBranch]:
-        for b in self.repo.branches.list(all=True, as_list=False):
-            yield GitLabBranch(T.cast(ProjectBranch, b), self)
+        with exc:
+            yield from map(
+                partial(GitLabBranch, repo=self), _iter_pages(self.repo.branches)
+            )
 
     @exc
     def get_branch(self, name: str) -> GitLabBranch:
@@ -268,30 +366,32 @@ class GitLabRepository(Repository):
         return self.get_branch(self.repo.default_branch)
 
     @property
-    @exc
     def tags(self) -> T.Iterator[GitLabTag]:
-        for t in self.repo.tags.list(all=True, as_list=False):
-            yield GitLabTag(T.cast(ProjectTag, t), self)
+        with exc:
+            yield from map(partial(GitLabTag, repo=self), _iter_pages(self.repo.tags))
 
     @exc
     def get_tag(self, name: str) -> GitLabTag:
         return GitLabTag(self.repo.tags.get(name), self)
 
     @property
-    @exc
     def releases(self) -> T.Iterator[GitLabRelease]:
-        for r in self.repo.releases.list(all=True, as_list=False):
-            yield GitLabRelease(T.cast(ProjectRelease, r), self)
+        with exc:
+            yield from map(
+                partial(GitLabRelease, repo=self), _iter_pages(self.repo.releases)
+            )
 
     @exc
     def get_release(self, name: str) -> GitLabRelease:
         return GitLabRelease(self.repo.releases.get(name), self)
 
     @property
-    @exc
     def pull_requests(self) -> T.Iterator[GitLabPullRequest]:
-        for pr in self.repo.mergerequests.list(all=True, as_list=False, state="opened"):
-            yield GitLabPullRequest(T.cast(ProjectMergeRequest, pr), self)
+        with exc:
+            yield from map(
+                partial(GitLabPullRequest, repo=self),
+                _iter_pages(self.repo.mergerequests, state="opened"),
+            )
 
     def merge_branches(self, base: GitLabBranch, source: GitLabBranch):
         # The GitLab API does not appear to support merging branches
@@ -310,7 +410,7 @@ class GitLabRepository(Repository):
         tag = self.repo.tags.create(
             {"tag_name": tag_name, "ref": commit.sha, "message": message}
         )
-        return GitLabTag(T.cast(ProjectTag, tag), self)
+        return GitLabTag(T.cast("ProjectTag", tag), self)
 
     @exc
     def create_release(
@@ -323,7 +423,7 @@ class GitLabRepository(Repository):
     ) -> GitLabRelease:
         # GitLab does not (as far as I know) support draft or prerelease flags
         release = T.cast(
-            ProjectRelease,
+            "ProjectRelease",
             self.repo.releases.create(
                 {
                     "name": name,
@@ -344,7 +444,7 @@ class GitLabRepository(Repository):
         body: T.Optional[str],
     ) -> GitLabPullRequest:
         pr = T.cast(
-            ProjectMergeRequest,
+            "ProjectMergeRequest",
             self.repo.mergerequests.create(
                 {
                     "source_branch": source.name,
@@ -360,37 +460,39 @@ class GitLabRepository(Repository):
 
 GitLabAuth = T.Union[GitLabOAuthTokenAuth, GitLabPersonalAccessTokenAuth]
 
+# Gitlab client credentials for each auth class.
+_AUTH_ARGS: dict[type, T.Callable[[T.Any], dict[str, T.Any]]] = {
+    GitLabPersonalAccessTokenAuth: lambda a: {"private_token": a.personal_access_token},
+    GitLabOAuthTokenAuth: lambda a: {"oauth_token": a.oauth_token},
+}
+
 
 @connection(
     host=GITLAB_HOST, auth_classes=[GitLabOAuthTokenAuth, GitLabPersonalAccessTokenAuth]
 )
 class GitLabConnection(Connection):
-    __slots__ = ["conn", "enterprise_url"]
+    __slots__ = ["conn", "enterprise_url", "domain"]
 
     conn: Gitlab
     enterprise_url: T.Optional[str]
+    domain: str
 
     def __init__(self, auth: GitLabAuth):
-        if isinstance(auth, GitLabPersonalAccessTokenAuth):
-            args = {"private_token": auth.personal_access_token}
-        else:
-            args = {"oauth_token": auth.oauth_token}
+        # Gitlab falls back to gitlab.com when `url` is None.
+        self.conn = Gitlab(url=auth.enterprise_url, **_AUTH_ARGS[type(auth)](auth))
 
         if auth.enterprise_url:
-            self.conn = Gitlab(url=auth.enterprise_url, **args)
             self.enterprise_url = urlsplit(auth.enterprise_url).netloc
         else:
-            self.conn = Gitlab(**args)
             self.enterprise_url = None
 
+        self.domain = self.enterprise_url or "gitlab.com"
+
+        self.conn.session = shared_session(auth, self.conn.session)
+
     @exc
     def get_repo(self, repo: str) -> GitLabRepository:
         return GitLabRepository(self.conn.projects.get(repo))
 
     def is_eligible_repo(self, repo: str) -> T.Tuple[bool, T.Optional[str]]:
-        if self.enterprise_url:
-            domain = self.enterprise_url
-        else:
-            domain = "gitlab.com"
-
-        return parse_common_repo_formats(repo, domain)
+        return parse_common_repo_formats(repo, self.domain)
@@ -0,0 +1,83 @@
+import copy
+import threading
+import typing as T
+import weakref
+
+from requests import PreparedRequest, Response, Session
+from requests.adapters import HTTPAdapter
+
+from .utils import LRUCache
+
+# Keep-alive connections kept per host; sized well above
+# utils.MAX_CONCURRENCY so concurrent requests never wait for a socket.
+POOL_MAXSIZE = 20
+
+S = T.TypeVar("S", bound=Session)
+
+# Sessions shared between live connections made with equal credentials, so
+# that they reuse one set of keep-alive connections and ETag cache. Entries
+# are weak: a session, its token and cached responses are dropped once no
+# connection uses it. requests.Session is safe to share between threads.
+_session_pool: "weakref.WeakValueDictionary[T.Hashable, Session]" = (
+    weakref.WeakValueDictionary()
+)
+_session_pool_lock = threading.Lock()
+
+
+class ConditionalCacheAdapter(HTTPAdapter):
+    """An HTTPAdapter that remembers the ETag of each successful GET
+    and revalidates it with If-None-Match on the next request for the
+    same resource. A 304 reply is answered from the stored response;
+    GitHub does not count those against the rate limit."""
+
+    _cache: LRUCache[T.Tuple[str, str], Response]
+
+    # Each entry keeps a whole Response, body included.
+    def __init__(self, *args, maxsize: int = 128, **kwargs):
+        kwargs.setdefault("pool_maxsize", POOL_MAXSIZE)
+        super().__init__(*args, **kwargs)
+        self._cache = LRUCache(maxsize)
+
+    def send(self, request: PreparedRequest, *args, **kwargs) -> Response:
+        if request.method != "GET" or not request.url:
+            return super().send(request, *args, **kwargs)
+
+        accept = request.headers.get("Accept", "")
+        if isinstance(accept, bytes):
+            accept = accept.decode("latin-1")
+        key = (request.url, accept)
+        cached = self._cache.get(key)
+        if cached is not None:
+            request.headers["If-None-Match"] = cached.headers["ETag"]
+
+        response = super().send(request, *args, **kwargs)
+
+        if response.status_code == 304 and cached is not None:
+            response.close()
+            replay = copy.copy(cached)
+            replay.request = request
+            return replay
+
+        if response.status_code == 200 and "ETag" in response.headers:
+            response.content  # Read the body now so it can be replayed.
+            self._cache[key] = response
+
+        return response
+
+
+def configure_session(session: Session):
+    """Mount a ConditionalCacheAdapter for all traffic on `session`."""
+    adapter = ConditionalCacheAdapter()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+
+def shared_session(key: T.Hashable, session: S) -> S:
+    """Return the session already registered under `key`, or configure
+    and register `session` if there is none yet."""
+    with _session_pool_lock:
+        shared = _session_pool.get(key)
+        if shared is None:
+            configure_session(session)
+            _session_pool[key] = shared = session
+        return T.cast(S, shared)
@@ -2,6 +2,8 @@ import abc
 import enum
 import typing as T
 
+from .utils import concurrent_map
+
 
 class CommitStatusEnum(str, enum.Enum):
     PENDING = "pending"
@@ -10,6 +12,8 @@ class CommitStatusEnum(str, enum.Enum):
 
 
 class CommitStatus(abc.ABC):
+    __slots__ = []
+
     @property
     @abc.abstractmethod
     def name(self) -> str:
@@ -32,6 +36,8 @@ class CommitStatus(abc.ABC):
 
 
 class Commit(abc.ABC):
+    __slots__ = []
+
     @property
     @abc.abstractmethod
     def sha(self) -> str:
@@ -63,6 +69,8 @@ class Commit(abc.ABC):
 
 
 class Branch(abc.ABC):
+    __slots__ = []
+
     @property
     @abc.abstractmethod
     def name(self) -> str:
@@ -75,6 +83,8 @@ class Branch(abc.ABC):
 
 
 class Tag(abc.ABC):
+    __slots__ = []
+
     @property
     @abc.abstractmethod
     def name(self) -> str:
@@ -92,6 +102,8 @@ class Tag(abc.ABC):
 
 
 class Release(abc.ABC):
+    __slots__ = []
+
     @property
     @abc.abstractmethod
     def tag(self) -> Tag:
@@ -121,6 +133,8 @@ class Release(abc.ABC):
 
 
 class PullRequest(abc.ABC):
+    __slots__ = []
+
     # TODO: name, user, status, identifier
 
     @property
@@ -221,8 +235,65 @@ class Repository(abc.ABC):
     ) -> PullRequest:
         ...
 
+    def bulk_set_commit_status(
+        self,
+        statuses: T.Iterable[
+            T.Tuple[Commit, CommitStatusEnum, str, T.Optional[str], T.Optional[str]]
+        ],
+    ) -> list[Commit]:
+        """Set many commit statuses concurrently. Each item is a commit
+        followed by the arguments to its `set_commit_status()`; the
+        commits are returned in input order."""
+
+        def set_status(
+            s: T.Tuple[
+                Commit, CommitStatusEnum, str, T.Optional[str], T.Optional[str]
+            ]
+        ) -> Commit:
+            s[0].set_commit_status(*s[1:])
+            return s[0]
+
+        return list(concurrent_map(set_status, statuses))
+
+    def bulk_create_tag(self, tags: T.Iterable[T.Tuple[str, Commit, str]]) -> list[Tag]:
+        """Create many tags concurrently. Each item holds the arguments
+        to `create_tag()`; tags are returned in input order."""
+        return list(concurrent_map(lambda t: self.create_tag(*t), tags))
+
+    def bulk_create_release(
+        self,
+        releases: T.Iterable[T.Tuple[Tag, str, T.Optional[str]]],
+        is_prerelease: bool = False,
+        is_draft: bool = False,
+    ) -> list[Release]:
+        """Create many releases concurrently. Each item holds the tag,
+        name and body for `create_release()`; the flags apply to all of
+        them. Releases are returned in input order."""
+        return list(
+            concurrent_map(
+                lambda r: self.create_release(*r, is_prerelease, is_draft), releases
+            )
+        )
+
+    def bulk_create_pull_request(
+        self,
+        pull_requests: T.Iterable[T.Tuple[str, Branch, Branch, T.Optional[str]]],
+    ) -> list[PullRequest]:
+        """Create many pull requests concurrently. Each item holds the
+        arguments to `create_pull_request()`; pull requests are returned
+        in input order."""
+        return list(
+            concurrent_map(lambda p: self.create_pull_request(*p), pull_requests)
+        )
+
 
 class Connection(abc.ABC):
+    __slots__ = []
+
+    # The host name in this connection's repo URLs, if it has a fixed one.
+    # ConnectionManager routes URLs naming it without probing others.
+    domain: T.Optional[str] = None
+
     @abc.abstractmethod
     def __init__(self, conn: T.Any):
         ...
@@ -1,22 +1,134 @@
+import re
+import threading
 import typing as T
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from itertools import islice
 
+# Upper bound on simultaneous requests issued by `concurrent_map`.
+MAX_CONCURRENCY = 5
 
-def parse_common_repo_formats(repo: str, domain: str) -> T.Tuple[bool, T.Optional[str]]:
-    repo = repo.removeprefix("https://")
-    repo = repo.removeprefix("ssh://")
-    repo = repo.removesuffix(".git")
+# Largest page size accepted by both the GitHub and GitLab list APIs.
+PER_PAGE = 100
+
+A = T.TypeVar("A")
+R = T.TypeVar("R")
+K = T.TypeVar("K")
+V = T.TypeVar("V")
+
+
+class _HasSha(T.Protocol):
+    @property
+    def sha(self) -> str:
+        ...
+
+
+C = T.TypeVar("C", bound=_HasSha)
+
+
+class LRUCache(T.Generic[K, V]):
+    """A thread-safe mapping holding at most `maxsize` entries,
+    evicting the least recently used one first."""
+
+    __slots__ = ["maxsize", "_data", "_lock"]
+
+    maxsize: int
+    _data: "OrderedDict[K, V]"
+    _lock: threading.Lock
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: K) -> T.Optional[V]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
 
-    ssh_prefix = f"git@{domain}:"
+    def __setitem__(self, key: K, value: V):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
 
-    if repo.startswith(domain):
-        return True, repo.removeprefix(domain).removeprefix("/")
+    def pop(self, key: K) -> T.Optional[V]:
+        with self._lock:
+            return self._data.pop(key, None)
 
-    if repo.startswith(ssh_prefix):
-        return True, repo.removeprefix(ssh_prefix)
+    def __len__(self) -> int:
+        return len(self._data)
 
-    if ":" not in repo:
-        splits = repo.split("/")
-        if len(splits) == 2:
-            return True, repo
+    def keys(self) -> list[K]:
+        with self._lock:
+            return list(self._data)
+
+
+class CommitCache(LRUCache[str, C]):
+    """Commits by full SHA. Commits are immutable, so one fetch per SHA is
+    enough; entries are keyed on the SHA of the fetched commit, so a ref or
+    abbreviated SHA passed in never pins a stale commit."""
+
+    __slots__ = []
+
+    def get_or_fetch(self, sha: str, fetch: T.Callable[[str], C]) -> C:
+        commit = self.get(sha)
+        if commit is None:
+            commit = fetch(sha)
+            self[commit.sha] = commit
+        return commit
+
+
+def concurrent_map(
+    f: T.Callable[[A], R], items: T.Iterable[A]
+) -> T.Generator[R, None, None]:
+    """Apply `f` to each item on a bounded thread pool, yielding
+    results in input order. Used to overlap blocking HTTP calls.
+    At most `MAX_CONCURRENCY` calls run ahead of the result being
+    consumed, so a caller that stops early does not pay for the rest;
+    closing the iterator cancels the calls that have not started."""
+    items = list(items)
+    if len(items) < 2:
+        # Nothing to overlap; skip the cost of starting a pool.
+        yield from map(f, items)
+        return
+
+    remaining = iter(items)
+    executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENCY)
+    pending: "deque[Future[R]]" = deque(
+        executor.submit(f, item) for item in islice(remaining, MAX_CONCURRENCY)
+    )
+    try:
+        while pending:
+            result = pending.popleft().result()
+            # Top the window up before handing the result over.
+            pending.extend(executor.submit(f, item) for item in islice(remaining, 1))
+            yield result
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+@lru_cache(maxsize=None)
+def repo_url_pattern(domain: str) -> T.Pattern[str]:
+    """Compile the URL forms accepted for repos on `domain`:
+    `[https://]domain/path`, `[ssh://]git@domain:path` and a bare
+    `owner/name`, each with an optional `.git` suffix."""
+    d = re.escape(domain)
+    return re.compile(
+        rf"(?:https://)?(?:ssh://)?"
+        rf"(?:{d}/|git@{d}:|(?=[^:/]*/[^:/]*$))"
+        rf"(?P<path>.*?)(?:\.git)?"
+    )
+
+
+@lru_cache(maxsize=1024)
+def parse_common_repo_formats(repo: str, domain: str) -> T.Tuple[bool, T.Optional[str]]:
+    m = repo_url_pattern(domain).fullmatch(repo)
+    if m:
+        return True, m["path"]
 
     return False, None
@@ -1,6 +1,29 @@
 import pytest
 
 
+def query_without_per_page(r1, r2):
+    # Some cassettes were recorded before list requests asked for a page
+    # size; as long as a list fits on one page the size changes nothing.
+    def strip(query):
+        return [(k, v) for (k, v) in query if k != "per_page"]
+
+    assert strip(r1.query) == strip(r2.query)
+
+
+def pytest_recording_configure(config, vcr):
+    vcr.register_matcher("query_without_per_page", query_without_per_page)
+
+
 @pytest.fixture(scope="module")
 def vcr_config():
-    return {"filter_headers": ["authorization", "PRIVATE-TOKEN"]}
+    return {
+        "filter_headers": ["authorization", "PRIVATE-TOKEN"],
+        "match_on": [
+            "method",
+            "scheme",
+            "host",
+            "port",
+            "path",
+            "query_without_per_page",
+        ],
+    }
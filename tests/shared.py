@@ -1,14 +1,24 @@
+import itertools
+import typing as T
+
 import pytest
 
 from manygit.exceptions import NotFoundError
 from manygit.types import CommitStatusEnum, Repository
 
+A = T.TypeVar("A")
+
+
+def _take_exactly(items: T.Iterator[A], n: int) -> list[A]:
+    # Reading one item past `n` proves the count without walking the rest.
+    taken = list(itertools.islice(items, n + 1))
+    assert len(taken) == n
+    return taken
+
 
 @pytest.mark.vcr
 def test_branches(repo: Repository, branch_commit: str):
-    assert set(branch.name for branch in repo.branches) == set(
-        ["main", "feature/add-file"]
-    )
+    assert {branch.name for branch in repo.branches} == {"main", "feature/add-file"}
 
     branch = repo.get_branch("feature/add-file")
     assert branch
@@ -32,9 +42,10 @@ def test_commits(repo: Repository, branch_commit: str, main_commit: str):
 @pytest.mark.vcr
 def test_commit_statuses(repo: Repository, main_commit: str):
     commit = repo.get_commit(main_commit)
-    assert set(status.name for status in commit.statuses) == set(["foo", "bar"])
+    statuses = list(commit.statuses)
+    assert {status.name for status in statuses} == {"foo", "bar"}
 
-    for cs in commit.statuses:
+    for cs in statuses:
         if cs.name == "foo":
             assert cs.name == "foo"
             assert cs.status is CommitStatusEnum.SUCCESS
@@ -49,7 +60,8 @@ def test_commit_statuses(repo: Repository, main_commit: str):
 
 @pytest.mark.vcr
 def test_tags(repo: Repository, main_commit: str):
-    assert len(list(repo.tags)) == 1
+    tags = _take_exactly(repo.tags, 1)
+    assert tags[0].name == "test"
     tag = repo.get_tag("test")
     assert tag
     assert tag.commit.sha == main_commit
@@ -62,7 +74,7 @@ def test_tags(repo: Repository, main_commit: str):
 
 @pytest.mark.vcr
 def test_releases(repo: Repository, main_commit: str):
-    assert len(list(repo.releases)) == 1
+    _take_exactly(repo.releases, 1)
     release = repo.get_release("test")
     assert release
     assert release.tag.name == "test"
@@ -76,8 +88,7 @@ def test_releases(repo: Repository, main_commit: str):
 
 @pytest.mark.vcr
 def test_pull_requests(repo: Repository):
-    assert len(list(repo.pull_requests)) == 1
-    pull_request = next(repo.pull_requests)
+    (pull_request,) = _take_exactly(repo.pull_requests, 1)
     assert pull_request
     assert pull_request.base.name == "main"
     assert pull_request.source.name == "feature/add-file"
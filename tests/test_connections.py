@@ -0,0 +1,105 @@
+import subprocess
+import sys
+import typing as T
+from unittest import mock
+
+import pytest
+
+from manygit import ConnectionManager
+from manygit.exceptions import ConnectionException
+from manygit.github import GITHUB_HOST, GitHubPersonalAccessTokenAuth
+from manygit.gitlab import (
+    GITLAB_HOST,
+    GitLabPersonalAccessTokenAuth,
+    GitLabRepository,
+)
+
+
+@pytest.fixture
+def cm() -> ConnectionManager:
+    return ConnectionManager(
+        [
+            GitHubPersonalAccessTokenAuth(personal_access_token="foo", username="bar"),
+            GitLabPersonalAccessTokenAuth(personal_access_token="foo"),
+        ]
+    )
+
+
+def test_add_connection__invalid(cm: ConnectionManager):
+    with pytest.raises(ConnectionException):
+        cm.add_connection("foo")
+
+
+def test_get_repo__host_hint(cm: ConnectionManager):
+    github, gitlab = cm.connections
+    assert cm._by_host[GITHUB_HOST] == [github]
+    assert cm._by_host[GITLAB_HOST] == [gitlab]
+
+    # Only the GitLab connection is probed, and it rejects a github.com URL.
+    with pytest.raises(ConnectionException):
+        cm.get_repo("https://github.com/davidmreed/manygit", host_hint=GITLAB_HOST)
+
+
+def test_get_repo__domain(cm: ConnectionManager):
+    github, gitlab = cm.connections
+    assert cm._by_domain["github.com"] == [github]
+    assert cm._by_domain["gitlab.com"] == [gitlab]
+
+    with mock.patch.object(type(github), "is_eligible_repo") as is_eligible_repo:
+        with mock.patch.object(type(gitlab), "get_repo") as get_repo:
+            cm.get_repo("git@gitlab.com:davidmreed/manygit-test.git")
+
+    # The GitHub connection is never probed for a gitlab.com URL.
+    is_eligible_repo.assert_not_called()
+    get_repo.assert_called_once_with("davidmreed/manygit-test")
+
+
+def test_get_repo__cached(cm: ConnectionManager):
+    _, gitlab = cm.connections
+    url = "https://gitlab.com/davidmreed/manygit-test"
+
+    with mock.patch.object(gitlab.conn.projects, "get") as get:
+        repo = cm.get_repo(url)
+        # Every spelling of the repo shares the entry.
+        assert cm.get_repo(url) is repo
+        assert cm.get_repo("git@gitlab.com:davidmreed/manygit-test.git") is repo
+        assert cm.get_repo("davidmreed/manygit-test", host_hint=GITLAB_HOST) is repo
+        assert get.call_count == 1
+
+        cm.invalidate_repo("gitlab.com/davidmreed/manygit-test")
+        assert cm.get_repo(url) is not repo
+        assert get.call_count == 2
+
+
+def test_get_repos(cm: ConnectionManager):
+    _, gitlab = cm.connections
+
+    with mock.patch.object(gitlab.conn.projects, "get") as get:
+        get.side_effect = lambda path: mock.Mock(path=path)
+        repos = cm.get_repos(
+            ["foo/bar", "gitlab.com/foo/baz", "foo/bar"], host_hint=GITLAB_HOST
+        )
+
+    assert [T.cast(GitLabRepository, r).repo.path for r in repos] == [
+        "foo/bar",
+        "foo/baz",
+        "foo/bar",
+    ]
+    assert repos[0] is repos[2]
+    assert get.call_count == 2
+
+
+def test_get_available_hosts():
+    # A fresh interpreter, so that no test has imported a backend already.
+    hosts = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import manygit.connections as c; print(sorted(c.get_available_hosts()))",
+        ],
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout.strip()
+
+    assert hosts == str(sorted([GITHUB_HOST, GITLAB_HOST]))
@@ -0,0 +1,67 @@
+import pytest
+
+from manygit.exceptions import NetworkError, NotFoundError, VCSException, map_exceptions
+
+
+class SourceError(Exception):
+    pass
+
+
+class SourceNotFoundError(SourceError):
+    pass
+
+
+exc = map_exceptions(
+    {
+        SourceError: VCSException,
+        SourceNotFoundError: NotFoundError,
+        (LookupError, lambda e: e.args == ("missing",)): NotFoundError,
+        lambda e: isinstance(e, OSError) and e.errno == 1: NetworkError,
+    }
+)
+
+
+@exc
+def raises(e: Exception):
+    raise e
+
+
+def test_map_exceptions__most_specific_type():
+    with pytest.raises(NotFoundError):
+        raises(SourceNotFoundError())
+
+    with pytest.raises(VCSException):
+        raises(SourceError())
+
+
+def test_map_exceptions__predicate():
+    with pytest.raises(NetworkError):
+        raises(OSError(1, "foo"))
+
+    with pytest.raises(OSError):
+        raises(OSError(2, "foo"))
+
+
+def test_map_exceptions__guarded_type():
+    with pytest.raises(NotFoundError):
+        raises(KeyError("missing"))
+
+    with pytest.raises(KeyError):
+        raises(KeyError("other"))
+
+
+def test_map_exceptions__unmapped():
+    with pytest.raises(KeyError):
+        raises(KeyError())
+
+
+def test_map_exceptions__context_manager():
+    def generator():
+        with exc:
+            yield 1
+            raise SourceNotFoundError()
+
+    items = generator()
+    assert next(items) == 1
+    with pytest.raises(NotFoundError):
+        next(items)
@@ -1,34 +1,38 @@
 import os
+from unittest import mock
+from urllib.parse import parse_qs
 
 import pytest
 
 from manygit import CommitStatusEnum, ConnectionManager, Repository
-from manygit.exceptions import ManygitException
+from manygit.exceptions import ManygitException, NotFoundError
 from manygit.github import (
+    GitHubCommit,
     GitHubConnection,
     GitHubPersonalAccessTokenAuth,
+    GitHubRelease,
     GitHubRepository,
     commit_status_from_github_status,
     commit_status_to_github_status,
 )
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def main_commit() -> str:
     return "0ab718932f224846be22c284cd4fd8f667b35c7b"
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def branch_commit() -> str:
     return "fa01244214a7e645a837ade228eaff17df6d7e62"
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def personal_access_token() -> str:
     return os.environ["GITHUB_ACCESS_TOKEN"]
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def username() -> str:
     return os.environ["GITHUB_USERNAME"]
 
@@ -64,6 +68,9 @@ def fake_enterprise_conn() -> GitHubConnection:
     )
 
 
+# Not session scoped: a session fixture is set up before the test's cassette
+# is inserted, so its project lookup would bypass the recordings, and each
+# cassette records its own lookup.
 @pytest.fixture
 def repo(conn: ConnectionManager) -> Repository:
     return conn.get_repo("https://github.com/davidmreed/manygit-test")
@@ -96,6 +103,7 @@ def test_branches(repo, branch_commit, main_commit):
 
 
 @pytest.mark.vcr
+@pytest.mark.xdist_group("github-mutating")
 def test_merge_branches(repo, main_commit, branch_commit, test_branches):
     # Create two branches and merge them together
     (foo, bar) = test_branches
@@ -108,6 +116,7 @@ def test_merge_branches(repo, main_commit, branch_commit, test_branches):
 
 
 @pytest.mark.vcr
+@pytest.mark.xdist_group("github-mutating")
 def test_create_tag(repo):
     t = repo.create_tag("foo", repo.default_branch.head, "This is a test tag")
 
@@ -122,6 +131,7 @@ def test_create_tag(repo):
 
 
 @pytest.mark.vcr
+@pytest.mark.xdist_group("github-mutating")
 def test_create_release(repo):
     t = repo.create_tag("foo", repo.default_branch.head, "This is a test tag")
     r = repo.create_release(
@@ -145,6 +155,7 @@ def test_create_release(repo):
 
 
 @pytest.mark.vcr
+@pytest.mark.xdist_group("github-mutating")
 def test_pull_request(repo, test_branches, main_commit, branch_commit):
     foo, bar = test_branches
 
@@ -161,6 +172,7 @@ def test_pull_request(repo, test_branches, main_commit, branch_commit):
 
 
 @pytest.mark.vcr
+@pytest.mark.xdist_group("github-mutating")
 def test_set_commit_status(repo: GitHubRepository, test_branches):
     foo, _ = test_branches
     # GitHub doesn't allow us to delete a commit status.
@@ -186,64 +198,170 @@ def test_set_commit_status(repo: GitHubRepository, test_branches):
     assert statuses[0].name == "Manygit Test"
 
 
-def test_is_eligible_repo(fake_conn: GitHubConnection):
-    assert fake_conn.is_eligible_repo("https://github.com/davidmreed/manygit") == (
-        True,
-        "davidmreed/manygit",
-    )
-    assert fake_conn.is_eligible_repo("git@github.com:davidmreed/manygit") == (
-        True,
-        "davidmreed/manygit",
-    )
-    assert fake_conn.is_eligible_repo("ssh://git@github.com:davidmreed/manygit") == (
-        True,
-        "davidmreed/manygit",
-    )
-    assert fake_conn.is_eligible_repo("git@github.com:davidmreed/manygit.git") == (
-        True,
-        "davidmreed/manygit",
-    )
-    assert fake_conn.is_eligible_repo("davidmreed/manygit") == (
-        True,
-        "davidmreed/manygit",
-    )
+@pytest.mark.parametrize(
+    "url,expected",
+    [
+        ("https://github.com/davidmreed/manygit", (True, "davidmreed/manygit")),
+        ("git@github.com:davidmreed/manygit", (True, "davidmreed/manygit")),
+        ("ssh://git@github.com:davidmreed/manygit", (True, "davidmreed/manygit")),
+        ("git@github.com:davidmreed/manygit.git", (True, "davidmreed/manygit")),
+        ("davidmreed/manygit", (True, "davidmreed/manygit")),
+        ("davidmreed/manygit/blah", (False, None)),
+        ("git@gitlab.com:davidmreed/manygit.git", (False, None)),
+    ],
+)
+def test_is_eligible_repo(fake_conn: GitHubConnection, url, expected):
+    assert fake_conn.is_eligible_repo(url) == expected
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "https://github.ravenwood.com/davidmreed/manygit",
+        "git@github.ravenwood.com:davidmreed/manygit",
+        "ssh://git@github.ravenwood.com:davidmreed/manygit",
+        "git@github.ravenwood.com:davidmreed/manygit.git",
+    ],
+)
+def test_is_eligible_repo__enterprise(fake_enterprise_conn: GitHubConnection, url):
+    assert fake_enterprise_conn.is_eligible_repo(url) == (True, "davidmreed/manygit")
 
-    assert fake_conn.is_eligible_repo("davidmreed/manygit/blah") == (
-        False,
-        None,
-    )
-    assert fake_conn.is_eligible_repo("git@gitlab.com:davidmreed/manygit.git") == (
-        False,
-        None,
-    )
 
+def test_get_repo__invalid_path(fake_conn: GitHubConnection):
+    with pytest.raises(NotFoundError):
+        fake_conn.get_repo("davidmreed/manygit/blah")
+    with pytest.raises(NotFoundError):
+        fake_conn.get_repo("manygit")
 
-def test_is_eligible_repo__enterprise(fake_enterprise_conn: GitHubConnection):
-    assert fake_enterprise_conn.is_eligible_repo(
-        "https://github.ravenwood.com/davidmreed/manygit"
-    ) == (True, "davidmreed/manygit")
-    assert fake_enterprise_conn.is_eligible_repo(
-        "git@github.ravenwood.com:davidmreed/manygit"
-    ) == (True, "davidmreed/manygit")
-    assert fake_enterprise_conn.is_eligible_repo(
-        "ssh://git@github.ravenwood.com:davidmreed/manygit"
-    ) == (True, "davidmreed/manygit")
-    assert fake_enterprise_conn.is_eligible_repo(
-        "git@github.ravenwood.com:davidmreed/manygit.git"
-    ) == (True, "davidmreed/manygit")
 
+@pytest.mark.parametrize(
+    "status,expected",
+    [
+        ("pending", CommitStatusEnum.PENDING),
+        ("error", CommitStatusEnum.FAILED),
+        ("failure", CommitStatusEnum.FAILED),
+        ("success", CommitStatusEnum.SUCCESS),
+    ],
+)
+def test_commit_status_to_github(status, expected):
+    assert commit_status_from_github_status(status) is expected
 
-def test_commit_status_to_github():
-    assert commit_status_from_github_status("pending") is CommitStatusEnum.PENDING
-    assert commit_status_from_github_status("error") is CommitStatusEnum.FAILED
-    assert commit_status_from_github_status("failure") is CommitStatusEnum.FAILED
-    assert commit_status_from_github_status("success") is CommitStatusEnum.SUCCESS
 
+def test_commit_status_to_github__invalid():
     with pytest.raises(ManygitException):
         commit_status_from_github_status("foo")
 
 
-def test_commit_status_from_github():
-    assert commit_status_to_github_status(CommitStatusEnum.PENDING) == "pending"
-    assert commit_status_to_github_status(CommitStatusEnum.FAILED) == "failure"
-    assert commit_status_to_github_status(CommitStatusEnum.SUCCESS) == "success"
+@pytest.mark.parametrize(
+    "status,expected",
+    [
+        (CommitStatusEnum.PENDING, "pending"),
+        (CommitStatusEnum.FAILED, "failure"),
+        (CommitStatusEnum.SUCCESS, "success"),
+    ],
+)
+def test_commit_status_from_github(status, expected):
+    assert commit_status_to_github_status(status) == expected
+
+
+def test_bulk_operations():
+    gh = mock.Mock()
+    repo = GitHubRepository(gh)
+    commits = [GitHubCommit(mock.Mock(sha=str(i)), repo) for i in range(10)]
+
+    assert (
+        repo.bulk_set_commit_status(
+            (c, CommitStatusEnum.SUCCESS, "Manygit Test", None, None) for c in commits
+        )
+        == commits
+    )
+    assert sorted(
+        c.kwargs["sha"] for c in gh.create_status.call_args_list
+    ) == sorted(c.sha for c in commits)
+
+    gh.create_tag.side_effect = lambda **kwargs: mock.Mock(tag=kwargs["tag"])
+    tags = repo.bulk_create_tag((f"tag-{c.sha}", c, "message") for c in commits)
+    assert [t.name for t in tags] == [f"tag-{c.sha}" for c in commits]
+
+
+def fake_github3_repo(has_last: bool) -> mock.Mock:
+    """A github3 repository serving three pages of two items each."""
+
+    def get(url, params, headers):
+        base, _, query = url.partition("?")
+        page = int(params.get("page") or parse_qs(query).get("page", ["1"])[0])
+        if has_last:
+            last_url = f"{base}?per_page=100&page=3"
+            links = {"last": {"url": last_url}} if page == 1 else {}
+        else:
+            next_url = f"{base}?per_page=100&page={page + 1}"
+            links = {} if page == 3 else {"next": {"url": next_url}}
+        return mock.Mock(links=links, page=page)
+
+    gh = mock.Mock()
+    gh._build_url.return_value = "https://api.github.com/repos/foo/bar/tags"
+    gh._get.side_effect = get
+    gh._json.side_effect = lambda response, code: [
+        {"page": response.page, "item": i} for i in range(2)
+    ]
+    return gh
+
+
+@pytest.mark.parametrize("has_last", [True, False])
+def test_iter_pages(has_last):
+    gh = fake_github3_repo(has_last)
+    repo = GitHubRepository(gh)
+
+    items = list(repo._iter_pages("tags", lambda json, session: json))
+
+    assert [(i["page"], i["item"]) for i in items] == [
+        (1, 0),
+        (1, 1),
+        (2, 0),
+        (2, 1),
+        (3, 0),
+        (3, 1),
+    ]
+    first = gh._get.call_args_list[0]
+    assert first.kwargs["params"]["per_page"] == "100"
+
+
+def test_iter_pages__lazy():
+    gh = fake_github3_repo(has_last=True)
+    repo = GitHubRepository(gh)
+
+    items = repo._iter_pages("tags", lambda json, session: json)
+    assert next(items) == {"page": 1, "item": 0}
+    assert gh._get.call_count == 1
+
+    items.close()
+    assert gh._get.call_count == 1
+
+
+def test_default_branch__fresh_head():
+    gh = mock.Mock(default_branch="main")
+    repo = GitHubRepository(gh)
+    heads = ["abc", "def"]
+    gh.branch.side_effect = lambda name: mock.Mock(
+        commit=mock.Mock(sha=heads.pop(0))
+    )
+    gh.commit.side_effect = lambda sha: mock.Mock(sha=sha)
+
+    # Each access reads the branch again, so a moved head is seen.
+    assert repo.default_branch.head.sha == "abc"
+    assert repo.default_branch.head.sha == "def"
+
+
+def test_release_commit__from_tag_name():
+    gh = mock.Mock()
+    repo = GitHubRepository(gh)
+    gh.commit.return_value = mock.Mock(sha="abc")
+    release = GitHubRelease(mock.Mock(tag_name="v1.0"), repo)
+
+    commit = release.commit
+    assert commit.sha == "abc"
+    gh.commit.assert_called_once_with("v1.0")
+    gh.ref.assert_not_called()
+
+    # The commit is cached under its SHA, not under the tag name.
+    assert repo.get_commit("abc") is commit
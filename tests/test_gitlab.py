@@ -1,33 +1,41 @@
 import os
 import time
 import typing as T
+from unittest import mock
 
 import pytest
-from gitlab.v4.objects import ProjectCommit
+from gitlab import Gitlab
+from gitlab.v4.objects import Project, ProjectBranch, ProjectCommit
 
 from manygit import CommitStatusEnum, ConnectionManager, Repository
 from manygit.exceptions import ManygitException, UnsupportedException
 from manygit.gitlab import (
+    GitLabBranch,
     GitLabCommit,
     GitLabConnection,
+    GitLabOAuthTokenAuth,
     GitLabPersonalAccessTokenAuth,
+    GitLabPullRequest,
+    GitLabRelease,
     GitLabRepository,
+    GitLabTag,
+    _iter_pages,
     commit_status_from_gitlab,
     commit_status_to_gitlab,
 )
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def main_commit() -> str:
     return "b0a6a46bcd70bf305d59ea86431affc1db6c27ac"
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def branch_commit() -> str:
     return "41d680e26e1a9dbe662c936716076cee72941215"
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def personal_access_token() -> str:
     return os.environ["GITLAB_ACCESS_TOKEN"]
 
@@ -62,6 +70,9 @@ def fake_enterprise_conn() -> GitLabConnection:
     )
 
 
+# Not session scoped: a session fixture is set up before the test's cassette
+# is inserted, so its project lookup would bypass the recordings, and each
+# cassette records its own lookup.
 @pytest.fixture
 def repo(conn: ConnectionManager) -> Repository:
     return conn.get_repo("https://gitlab.com/davidmreed/manygit-test")
@@ -82,6 +93,7 @@ def test_branches(repo, branch_commit, main_commit):
 
 
 @pytest.mark.vcr
+@pytest.mark.xdist_group("gitlab-mutating")
 def test_merge_branches(repo, main_commit, branch_commit, test_branches):
     # Create two branches and merge them together
     (foo, bar) = test_branches
@@ -91,6 +103,7 @@ def test_merge_branches(repo, main_commit, branch_commit, test_branches):
 
 
 @pytest.mark.vcr
+@pytest.mark.xdist_group("gitlab-mutating")
 def test_create_tag(repo):
     t = repo.create_tag("foo", repo.default_branch.head, "This is a test tag")
 
@@ -103,6 +116,7 @@ def test_create_tag(repo):
 
 
 @pytest.mark.vcr
+@pytest.mark.xdist_group("gitlab-mutating")
 def test_create_release(repo: GitLabRepository):
     t = repo.create_tag("foo", repo.default_branch.head, "This is a test tag")
     r = repo.create_release(
@@ -118,19 +132,35 @@ def test_create_release(repo: GitLabRepository):
         t.tag.delete()
 
 
+def wait_until_mergeable(
+    pr: GitLabPullRequest, timeout: float = 10.0, interval: float = 0.25
+):
+    # GitLab checks mergeability asynchronously after a PR is created, and
+    # returns HTTP 406 branch cannot be merged if asked to merge before then.
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        pr.pr.refresh()
+        if pr.pr.merge_status == "can_be_merged":
+            return
+        time.sleep(interval)
+
+    raise TimeoutError(f"Merge request {pr.pr.iid} did not become mergeable")
+
+
 @pytest.mark.vcr
+@pytest.mark.xdist_group("gitlab-mutating")
 def test_create_pull_request(
-    repo: GitLabRepository, test_branches, main_commit, branch_commit
+    repo: GitLabRepository, test_branches, main_commit, branch_commit, record_mode
 ):
-    foo, bar = test_branches
+    (foo, bar) = test_branches
 
     pr = repo.create_pull_request("Test PR", foo, bar, "This is the body")
     assert pr.base.name == foo.name
     assert pr.source.name == bar.name
 
-    # GitLab appears to require a slight wait before merging a freshly-created PR.
-    # Otherwise, it returns HTTP 406 branch cannot be merged.
-    time.sleep(10)
+    # The cassette already holds the successful merge, so only wait live.
+    if record_mode != "none":
+        wait_until_mergeable(pr)
     pr.merge()
 
     commit_parents = list(repo.get_branch(foo.name).head.parents)
@@ -140,6 +170,7 @@ def test_create_pull_request(
 
 
 @pytest.mark.vcr
+@pytest.mark.xdist_group("gitlab-mutating")
 def test_set_commit_status(repo: GitLabRepository, test_branches):
     foo, _ = test_branches
     # Create a temporary branch and commit to apply the status to.
@@ -159,7 +190,8 @@ def test_set_commit_status(repo: GitLabRepository, test_branches):
                     ],
                 }
             ),
-        )
+        ),
+        repo,
     )
 
     commit.set_commit_status(
@@ -175,61 +207,171 @@ def test_set_commit_status(repo: GitLabRepository, test_branches):
     assert statuses[0].name == "Manygit Test"
 
 
-def test_is_eligible_repo(fake_conn: GitLabConnection):
-    assert fake_conn.is_eligible_repo("https://gitlab.com/davidmreed/manygit") == (
-        True,
-        "davidmreed/manygit",
-    )
-    assert fake_conn.is_eligible_repo("git@gitlab.com:davidmreed/manygit") == (
-        True,
-        "davidmreed/manygit",
-    )
-    assert fake_conn.is_eligible_repo("ssh://git@gitlab.com:davidmreed/manygit") == (
-        True,
-        "davidmreed/manygit",
-    )
-    assert fake_conn.is_eligible_repo("git@gitlab.com:davidmreed/manygit.git") == (
-        True,
-        "davidmreed/manygit",
-    )
-    assert fake_conn.is_eligible_repo("davidmreed/manygit") == (
-        True,
-        "davidmreed/manygit",
-    )
+@pytest.mark.parametrize(
+    "url,expected",
+    [
+        ("https://gitlab.com/davidmreed/manygit", (True, "davidmreed/manygit")),
+        ("git@gitlab.com:davidmreed/manygit", (True, "davidmreed/manygit")),
+        ("ssh://git@gitlab.com:davidmreed/manygit", (True, "davidmreed/manygit")),
+        ("git@gitlab.com:davidmreed/manygit.git", (True, "davidmreed/manygit")),
+        ("davidmreed/manygit", (True, "davidmreed/manygit")),
+        ("git@github.com:davidmreed/manygit.git", (False, None)),
+    ],
+)
+def test_is_eligible_repo(fake_conn: GitLabConnection, url, expected):
+    assert fake_conn.is_eligible_repo(url) == expected
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "https://gitlab.ravenwood.com/davidmreed/manygit",
+        "git@gitlab.ravenwood.com:davidmreed/manygit",
+        "ssh://git@gitlab.ravenwood.com:davidmreed/manygit",
+        "git@gitlab.ravenwood.com:davidmreed/manygit.git",
+    ],
+)
+def test_is_eligible_repo__enterprise(fake_enterprise_conn: GitLabConnection, url):
+    assert fake_enterprise_conn.is_eligible_repo(url) == (True, "davidmreed/manygit")
+
+
+@pytest.mark.parametrize(
+    "status,expected",
+    [
+        ("pending", CommitStatusEnum.PENDING),
+        ("running", CommitStatusEnum.PENDING),
+        ("failed", CommitStatusEnum.FAILED),
+        ("canceled", CommitStatusEnum.FAILED),
+        ("success", CommitStatusEnum.SUCCESS),
+    ],
+)
+def test_commit_status_to_gitlab(status, expected):
+    assert commit_status_from_gitlab(status) is expected
+
+
+def test_commit_status_to_gitlab__invalid():
+    with pytest.raises(ManygitException):
+        commit_status_from_gitlab("foo")
+
 
-    assert fake_conn.is_eligible_repo("git@github.com:davidmreed/manygit.git") == (
-        False,
-        None,
+@pytest.mark.parametrize(
+    "status,expected",
+    [
+        (CommitStatusEnum.PENDING, "pending"),
+        (CommitStatusEnum.FAILED, "failed"),
+        (CommitStatusEnum.SUCCESS, "success"),
+    ],
+)
+def test_commit_status_from_gitlab(status, expected):
+    assert commit_status_to_gitlab(status) == expected
+
+
+def fake_manager(total_pages: T.Optional[int]) -> mock.Mock:
+    def http_get(path, query_data, raw):
+        _, _, next_page = path.partition("?page=")
+        page = query_data.get("page", int(next_page or 1))
+        headers = {"X-Total-Pages": str(total_pages)} if total_pages else {}
+        links = {} if page == 3 else {"next": {"url": f"next?page={page + 1}"}}
+        return mock.Mock(
+            headers=headers,
+            links=links,
+            json=lambda: [{"page": page, "item": i} for i in range(2)],
+        )
+
+    manager = mock.Mock(path="/projects/1/repository/tags")
+    manager._obj_cls = lambda manager, attrs, created_from_list: attrs
+    manager.gitlab.http_get.side_effect = http_get
+    return manager
+
+
+@pytest.mark.parametrize("total_pages", [3, None])
+def test_iter_pages(total_pages):
+    manager = fake_manager(total_pages)
+
+    items = list(_iter_pages(manager, state="opened"))
+
+    assert [(i["page"], i["item"]) for i in items] == [
+        (1, 0),
+        (1, 1),
+        (2, 0),
+        (2, 1),
+        (3, 0),
+        (3, 1),
+    ]
+    first = manager.gitlab.http_get.call_args_list[0]
+    assert first.kwargs["query_data"] == {"state": "opened", "per_page": 100}
+
+
+def test_iter_pages__lazy():
+    manager = fake_manager(total_pages=3)
+
+    items = _iter_pages(manager)
+    assert next(items) == {"page": 1, "item": 0}
+    assert manager.gitlab.http_get.call_count == 1
+
+    items.close()
+    assert manager.gitlab.http_get.call_count == 1
+
+
+def test_branch_head__from_embedded_commit():
+    repo = GitLabRepository(Project(Gitlab().projects, {"id": 1}))
+    branch = GitLabBranch(
+        ProjectBranch(
+            repo.repo.branches,
+            {"name": "main", "commit": {"id": "abc", "parent_ids": ["def"]}},
+        ),
+        repo,
     )
 
+    # Built from the branch payload, without fetching the commit.
+    head = branch.head
+    assert head.sha == "abc"
+    assert head.commit.parent_ids == ["def"]
 
-def test_is_eligible_repo__enterprise(fake_enterprise_conn: GitLabConnection):
-    assert fake_enterprise_conn.is_eligible_repo(
-        "https://gitlab.ravenwood.com/davidmreed/manygit"
-    ) == (True, "davidmreed/manygit")
-    assert fake_enterprise_conn.is_eligible_repo(
-        "git@gitlab.ravenwood.com:davidmreed/manygit"
-    ) == (True, "davidmreed/manygit")
-    assert fake_enterprise_conn.is_eligible_repo(
-        "ssh://git@gitlab.ravenwood.com:davidmreed/manygit"
-    ) == (True, "davidmreed/manygit")
-    assert fake_enterprise_conn.is_eligible_repo(
-        "git@gitlab.ravenwood.com:davidmreed/manygit.git"
-    ) == (True, "davidmreed/manygit")
-
-
-def test_commit_status_to_gitlab():
-    assert commit_status_from_gitlab("pending") is CommitStatusEnum.PENDING
-    assert commit_status_from_gitlab("running") is CommitStatusEnum.PENDING
-    assert commit_status_from_gitlab("failed") is CommitStatusEnum.FAILED
-    assert commit_status_from_gitlab("canceled") is CommitStatusEnum.FAILED
-    assert commit_status_from_gitlab("success") is CommitStatusEnum.SUCCESS
+    # The partial payload is not cached, so get_commit() fetches it whole.
+    with mock.patch.object(repo.repo.commits, "get") as get:
+        get.return_value = ProjectCommit(
+            repo.repo.commits, {"id": "abc", "parent_ids": ["def"], "title": "Fix"}
+        )
+        commit = repo.get_commit(head.sha)
+        get.assert_called_once_with(id="abc")
+    assert commit.commit.title == "Fix"
 
-    with pytest.raises(ManygitException):
-        commit_status_from_gitlab("foo")
 
+def test_bulk_create():
+    project = mock.Mock()
+    repo = GitLabRepository(project)
+    project.releases.create.side_effect = lambda data: mock.Mock(
+        tag_name=data["tag_name"]
+    )
+    project.mergerequests.create.side_effect = lambda data: mock.Mock(
+        source_branch=data["source_branch"]
+    )
+    tags = [mock.Mock(spec=GitLabTag) for _ in range(10)]
+    for i, tag in enumerate(tags):
+        tag.name = f"tag-{i}"
+    base = mock.Mock(spec=GitLabBranch)
 
-def test_commit_status_from_gitlab():
-    assert commit_status_to_gitlab(CommitStatusEnum.PENDING) == "pending"
-    assert commit_status_to_gitlab(CommitStatusEnum.FAILED) == "failed"
-    assert commit_status_to_gitlab(CommitStatusEnum.SUCCESS) == "success"
+    releases = repo.bulk_create_release(
+        (tag, f"release-{i}", None) for i, tag in enumerate(tags)
+    )
+    assert [T.cast(GitLabRelease, r).release.tag_name for r in releases] == [
+        t.name for t in tags
+    ]
+
+    sources = [mock.Mock(spec=GitLabBranch) for _ in range(10)]
+    prs = repo.bulk_create_pull_request(
+        ("title", base, source, None) for source in sources
+    )
+    assert [T.cast(GitLabPullRequest, pr).pr.source_branch for pr in prs] == [
+        s.name for s in sources
+    ]
+
+
+def test_connection__oauth_token():
+    # GitLabConnection is typed through the registering decorator as a plain
+    # Connection, so the client is checked at construction instead.
+    with mock.patch("manygit.gitlab.Gitlab") as gitlab:
+        with mock.patch("manygit.gitlab.shared_session"):
+            GitLabConnection(GitLabOAuthTokenAuth(oauth_token="foo"))
+    gitlab.assert_called_once_with(url=None, oauth_token="foo")
@@ -0,0 +1,74 @@
+import gc
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from manygit.session import ConditionalCacheAdapter, shared_session
+
+
+def make_response(
+    status_code: int, body: bytes = b"", etag: str = ""
+) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = body
+    response._content_consumed = True
+    if etag:
+        response.headers["ETag"] = etag
+    return response
+
+
+def test_conditional_cache_adapter(monkeypatch):
+    sent = []
+    replies = [make_response(200, b"first", '"abc"'), make_response(304)]
+
+    def send(self, request, *args, **kwargs):
+        sent.append(request.headers.get("If-None-Match"))
+        return replies.pop(0)
+
+    monkeypatch.setattr(HTTPAdapter, "send", send)
+
+    session = requests.Session()
+    session.mount("https://", ConditionalCacheAdapter())
+
+    assert session.get("https://api.github.com/foo").content == b"first"
+    second = session.get("https://api.github.com/foo")
+
+    assert second.status_code == 200
+    assert second.content == b"first"
+    assert sent == [None, '"abc"']
+
+
+def test_conditional_cache_adapter__maxsize(monkeypatch):
+    monkeypatch.setattr(
+        HTTPAdapter,
+        "send",
+        lambda self, request, *args, **kwargs: make_response(200, b"", '"abc"'),
+    )
+
+    adapter = ConditionalCacheAdapter(maxsize=1)
+    session = requests.Session()
+    session.mount("https://", adapter)
+
+    session.get("https://api.github.com/foo")
+    session.get("https://api.github.com/bar")
+
+    assert [url for url, _ in adapter._cache.keys()] == ["https://api.github.com/bar"]
+
+
+def test_shared_session():
+    first = requests.Session()
+    assert shared_session(("test_shared_session", 1), first) is first
+    assert isinstance(first.get_adapter("https://example.com"), ConditionalCacheAdapter)
+
+    assert shared_session(("test_shared_session", 1), requests.Session()) is first
+    assert shared_session(("test_shared_session", 2), requests.Session()) is not first
+
+
+def test_shared_session__released():
+    shared_session(("test_shared_session__released", 1), requests.Session())
+    gc.collect()
+
+    # Nothing holds the first session any more, so it isn't handed out again.
+    second = requests.Session()
+    assert shared_session(("test_shared_session__released", 1), second) is second
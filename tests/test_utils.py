@@ -0,0 +1,94 @@
+import re
+
+from manygit.utils import (
+    MAX_CONCURRENCY,
+    CommitCache,
+    LRUCache,
+    concurrent_map,
+    parse_common_repo_formats,
+    repo_url_pattern,
+)
+
+
+def test_lru_cache():
+    cache: LRUCache[str, int] = LRUCache(maxsize=2)
+    cache["a"] = 1
+    cache["b"] = 2
+    assert cache.get("a") == 1
+
+    # "b" is now the least recently used entry.
+    cache["c"] = 3
+    assert cache.get("b") is None
+    assert cache.keys() == ["a", "c"]
+    assert len(cache) == 2
+
+    assert cache.pop("a") == 1
+    assert cache.pop("a") is None
+    assert cache.keys() == ["c"]
+
+
+def test_commit_cache():
+    class FakeCommit:
+        def __init__(self, sha):
+            self.sha = sha
+
+    fetched = []
+
+    def fetch(sha):
+        fetched.append(sha)
+        return FakeCommit("abcdef")
+
+    cache: CommitCache[FakeCommit] = CommitCache()
+    commit = cache.get_or_fetch("main", fetch)
+    assert cache.get_or_fetch("abcdef", fetch) is commit
+
+    # A ref may move, so it is fetched again; only the SHA is cached.
+    assert cache.get_or_fetch("main", fetch) is not commit
+    assert fetched == ["main", "main"]
+    assert cache.keys() == ["abcdef"]
+
+
+def test_concurrent_map():
+    def double(x: int) -> int:
+        return x * 2
+
+    assert list(concurrent_map(double, range(10))) == list(range(0, 20, 2))
+    assert list(concurrent_map(double, [3])) == [6]
+    assert list(concurrent_map(double, [])) == []
+
+
+def test_concurrent_map__bounded():
+    started = []
+
+    def f(x):
+        started.append(x)
+        return x
+
+    results = concurrent_map(f, range(100))
+    assert next(results) == 0
+    results.close()
+
+    # Only the calls submitted ahead of the first result ever ran.
+    assert len(started) <= MAX_CONCURRENCY + 1
+
+
+def test_parse_common_repo_formats():
+    assert parse_common_repo_formats("github.com/foo/bar.git", "github.com") == (
+        True,
+        "foo/bar",
+    )
+    assert parse_common_repo_formats("foo/bar", "github.com") == (True, "foo/bar")
+    assert parse_common_repo_formats("https://foo/bar", "github.com") == (
+        True,
+        "foo/bar",
+    )
+    assert parse_common_repo_formats("bitbucket.org/foo/bar", "github.com") == (
+        False,
+        None,
+    )
+
+
+def test_repo_url_pattern__compiled_once():
+    pattern = repo_url_pattern("github.com")
+    assert isinstance(pattern, re.Pattern)
+    assert repo_url_pattern("github.com") is pattern